@@ -1,4 +1,5 @@
 import numpy as np
+from numba import njit
 
 
 def initialize_state(grid_size, rng):
@@ -16,23 +17,23 @@ def initialize_state(grid_size, rng):
     """
     #if rng.random() < 0.5:
      #   return -np.ones((grid_size, grid_size))
-    return np.ones((grid_size, grid_size))
+    return np.ones((grid_size, grid_size), dtype=np.int8)
 
 
-def _get_neighborhood(state, pos):
-    """Get total spin of a four neighboring spins."""
-    grid_size = state.shape[0]
+def _make_exp_table(beta):
+    """Get Metropolis acceptance probabilities min(1, exp(-beta*dE)).
 
-    # boundaries continue on opposite side
-    return (
-        state[(pos[0] + 1) % grid_size, pos[1]]
-        + state[(pos[0] - 1) % grid_size, pos[1]]
-        + state[pos[0], (pos[1] + 1) % grid_size]
-        + state[pos[0], (pos[1] - 1) % grid_size]
-    )
+    Table is indexed by s * (sum of neighbors) + 4, where dE = 2*s*n. It
+    only depends on beta, so it can be built once and passed to the
+    update functions as exp_table.
+    """
+    dE = 2 * np.arange(-4, 5)
+    # dE <= 0 is accepted exactly (also at beta = inf); exponent is only
+    # evaluated for dE > 0 to avoid inf*0
+    return np.where(dE <= 0, 1.0, np.exp(-beta * np.maximum(dE, 1)))
 
 
-def update_state_ising(state, beta, rng):
+def update_state_ising(state, beta, rng, exp_table=None):
     """Update state according to Glauber Ising model.
 
     Input:
@@ -42,22 +43,108 @@ def update_state_ising(state, beta, rng):
             Inverse temperature (1/kT).
         rng:
             numpy Random Generator (or compatible) object.
+        exp_table:
+            Acceptance table from _make_exp_table(beta). Built from beta
+            if not given.
 
     Output:
         Updated state of the model ([N x N] square array) after N**2 MC
         steps.
     """
-    exponent = np.exp(-np.arange(1, 3) * 4 * beta)
+    if exp_table is None:
+        exp_table = _make_exp_table(beta)
 
     grid_size = state.shape[0]
     n_steps = grid_size**2
 
-    for _ in range(n_steps):
-        pos = rng.integers(0, grid_size, size=2)
+    # random numbers for the whole sweep are drawn in one go
+    pos_i = rng.integers(0, grid_size, size=n_steps)
+    pos_j = rng.integers(0, grid_size, size=n_steps)
+    u = rng.random(n_steps)
+
+    return _sweep_ising(state, exp_table, pos_i, pos_j, u)
+
+
+def update_state_ising_checkerboard(state, beta, rng, exp_table=None):
+    """Update state according to Ising model using checkerboard sweeps.
+
+    Lattice is split into two sublattices ("black" and "white") in which
+    no two sites are neighbors, so all sites of one color can be updated
+    at once. Every site gets exactly one Metropolis update per sweep, in
+    a fixed color order, instead of N**2 updates at random positions;
+    equilibrium is the same but the dynamics differ slightly from
+    update_state_ising.
+
+    Input:
+        state:
+            Square [N x N] array encoding the state of the Ising model.
+            N must be even, otherwise the periodic boundary joins sites
+            of the same color and ValueError is raised.
+        beta:
+            Inverse temperature (1/kT).
+        rng:
+            numpy Random Generator (or compatible) object.
+        exp_table:
+            Acceptance table from _make_exp_table(beta). Built from beta
+            if not given.
+
+    Output:
+        Updated state of the model ([N x N] square array) after one sweep
+        of both sublattices.
+    """
+    grid_size = state.shape[0]
+    if grid_size % 2:
+        raise ValueError(
+            f"checkerboard sweep needs an even grid size, got {grid_size}"
+        )
+
+    if exp_table is None:
+        exp_table = _make_exp_table(beta)
+
+    # quarter lattices (views into state): "black" sites a, d only
+    # neighbor "white" sites b, c and vice versa; rolling a quarter
+    # lattice wraps around the periodic border
+    a = state[0::2, 0::2]
+    b = state[0::2, 1::2]
+    c = state[1::2, 0::2]
+    d = state[1::2, 1::2]
+
+    _update_sublattice(a, c + np.roll(c, 1, 0) + b + np.roll(b, 1, 1), exp_table, rng)
+    _update_sublattice(d, b + np.roll(b, -1, 0) + c + np.roll(c, -1, 1), exp_table, rng)
+    _update_sublattice(b, d + np.roll(d, 1, 0) + a + np.roll(a, -1, 1), exp_table, rng)
+    _update_sublattice(c, a + np.roll(a, -1, 0) + d + np.roll(d, 1, 1), exp_table, rng)
+
+    return state
+
 
-        dE = 2 * state[pos[0], pos[1]] * _get_neighborhood(state, pos)
+def _update_sublattice(sub, nbrs, exp_table, rng):
+    """Metropolis update of all sites of sub (a view into state) at once,
+    given the sums of their neighbors."""
+    key = (sub * nbrs + 4).astype(int)
+    flip = rng.random(sub.shape) < exp_table[key]
+    sub[flip] = -sub[flip]
+
+
+@njit(cache=True, fastmath=True)
+def _sweep_ising(state, exp_table, pos_i, pos_j, u):
+    """Perform Metropolis steps on state in place (compiled), one for
+    each pre-drawn position and uniform number."""
+    grid_size = state.shape[0]
 
-        if (dE <= 0) or (rng.random() < exponent[int(dE / 4 - 1)]):
-            state[pos[0], pos[1]] = -state[pos[0], pos[1]]
+    for k in range(pos_i.shape[0]):
+        i = pos_i[k]
+        j = pos_j[k]
+
+        # boundaries continue on opposite side
+        key = int(state[i, j] * (
+            state[(i + 1) % grid_size, j]
+            + state[(i - 1) % grid_size, j]
+            + state[i, (j + 1) % grid_size]
+            + state[i, (j - 1) % grid_size]
+        )) + 4
+
+        # exp_table is 1 for dE <= 0, so no branch on the sign of dE
+        if u[k] < exp_table[key]:
+            state[i, j] = -state[i, j]
 
     return state
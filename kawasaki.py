@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from numba import njit
 
 def initialize_kawasaki(grid_size, m, rng=np.random.default_rng()):
     '''
@@ -18,50 +19,29 @@ def initialize_kawasaki(grid_size, m, rng=np.random.default_rng()):
             Matrix of grid_size dimensions. Contains spins in proportion to conserved-order parameter value.
             
     '''
-    a = np.arange(0, grid_size**2).reshape(grid_size, grid_size)
-    a[a < grid_size*grid_size*0.5*(m+1)] = 1
-    a[a >= grid_size*grid_size*0.5*(m+1)] = -1
-    a = a.ravel()
+    a = np.where(np.arange(grid_size**2) < grid_size*grid_size*0.5*(m+1), 1, -1).astype(np.int8)
     rng.shuffle(a)
-    a = a.reshape(grid_size,grid_size)
     
-    return a
+    return a.reshape(grid_size, grid_size)
 
 def get_lists(state):
     '''
-    Obtain two lists from matrix of Ising model. One is comprised of coordinates for up spins and another with coordinates for down spins.
+    Obtain coordinate lists from matrix of Ising model, for up spins and for down spins. Row and column coordinates are kept in separate 1D arrays.
     Input:
         state:
             Matrix of grid_size**2 lattice count. Each lattice contains up (+1) or down (-1) spin values.
     Output:
-        up:
-            List of coordinates in Ising matrix for up (+1) spins.
-        down:
-            List of coordinates in Ising matrix for down (-1) spins.
+        up_i, up_j:
+            Row and column coordinates in Ising matrix for up (+1) spins.
+        down_i, down_j:
+            Row and column coordinates in Ising matrix for down (-1) spins.
     '''
-    up = np.ndarray((state.shape[0]**2, 2)).astype(int)
-    up.fill(-1)
+    up_i, up_j = np.nonzero(state == 1)
+    down_i, down_j = np.nonzero(state == -1)
     
-    down = np.ndarray((state.shape[0]**2, 2)).astype(int)
-    down.fill(-1)
-    
-    i_u = 0
-    i_d = 0
-    
-    
-    for i, j in np.ndindex(state.shape):
-        if state[i, j] == 1:
-            up[i_u, :] = i, j
-            i_u +=1
-        else:
-            down[i_d, :] = i, j
-            i_d +=1
-    
-    up = up[~np.all(up == -1, axis=1)]
-    down = down[~np.all(down == -1, axis=1)]
-    
-    return up, down
+    return up_i.astype(np.int32), up_j.astype(np.int32), down_i.astype(np.int32), down_j.astype(np.int32)
 
+@njit(cache=True)
 def get_neighborhood(state, pos):
     '''
     Gets sum of spins of closest neighbours. Closest meaning bordering on the side lattices.
@@ -84,78 +64,82 @@ def get_neighborhood(state, pos):
         + state[pos[0], (pos[1] - 1) % grid_size]
     )
 
-def coord_swap(up, down, p1, p2):
-    
-    up[p1, 0], down[p2, 0] = coord_swap_2(up[p1, 0], down[p2, 0])
-    up[p1, 1], down[p2, 1] = coord_swap_2(up[p1, 1], down[p2, 1])
-    
-    
-    return up, down
-
-def coord_swap_2(x1, y1):
+def _make_exp_table(beta):
     '''
-    Function is used because a,b=b,a form doesnt work for arrays of dim>1 (like up and down from get_lists(). See discussion comments on: https://stackoverflow.com/questions/22847410/swap-two-values-in-a-numpy-array
+    Acceptance probabilities min(1, exp(-beta*dE)) for every dE in [-16, 16], indexed by dE + 16. Depends only on beta, so it can be built once and passed to update_state_kawasaki.
     '''
-    
-    temp = x1
-    x1 = y1
-    y1 = temp
-    
-    return x1, y1
+    dE = np.arange(-16, 17)
+    #dE <= 0 is accepted exactly (also at beta = inf), exponent is only evaluated for dE > 0 to avoid inf*0
+    return np.where(dE <= 0, 1.0, np.exp(-beta * np.maximum(dE, 1)))
 
-def update_state_kawasaki(up, down, state, beta, rng):
+def update_state_kawasaki(up_i, up_j, down_i, down_j, state, beta, rng, exp_table=None):
     """Update state according to Glauber Ising model.
 
     Input:
-        up:
-            List of coordinates in Ising matrix for up (+1) spins.
-        down:
-            List of coordinates in Ising matrix for down (-1) spins.
+        up_i, up_j:
+            Row and column coordinates in Ising matrix for up (+1) spins,
+            as returned by get_lists. Updated in place.
+        down_i, down_j:
+            Row and column coordinates in Ising matrix for down (-1)
+            spins, as returned by get_lists. Updated in place.
         state:
             Square [N x N] array encoding the state of the Ising model.
         beta:
             Inverse temperature (1/kT).
         rng:
             numpy Random Generator (or compatible) object.
+        exp_table:
+            Acceptance table from _make_exp_table(beta). Built from beta
+            if not given.
 
     Output:
         Updated state of the model ([N x N] square array) after N**2 MC
         steps.
     """
-    #instead of looking for certain possible exp values, let's calculate exponents e^1 to e^16
-    #exponent = np.exp(-np.arange(2, 5) * 4 * beta)
-    exponent = np.exp(-np.arange(1, 17) * beta) 
+    if exp_table is None:
+        exp_table = _make_exp_table(beta)
     
-    grid_size = state.shape[0]
-    n_steps = grid_size**2
+    n_steps = state.shape[0]**2
+    
+    #random numbers for the whole sweep are drawn in one go
+    p1s = rng.integers(0, up_i.shape[0], size=n_steps)
+    p2s = rng.integers(0, down_i.shape[0], size=n_steps)
+    rand = rng.random(n_steps)
+    
+    return _sweep_kawasaki(up_i, up_j, down_i, down_j, state, exp_table, p1s, p2s, rand)
 
-    for _ in range(n_steps):
-        p1 = rng.integers(0, up.shape[0])
-        p2 = rng.integers(0, down.shape[0])
+@njit(cache=True, fastmath=True)
+def _sweep_kawasaki(up_i, up_j, down_i, down_j, state, exp_table, p1s, p2s, rand):
+    """Perform Kawasaki exchange steps on state and coordinate lists in place (compiled), one for each pre-drawn pair."""
+    grid_size = state.shape[0]
+    
+    for k in range(p1s.shape[0]):
+        p1 = p1s[k]
+        p2 = p2s[k]
         
         '''
-        Different methods are applied than in Ising Metropolis for switching neighbouring or far away spins.
+        Energy difference is calculated from the current state only (equation from Newman), so spins are flipped only if the exchange is accepted.
         
-        For neighbouring - we calculate difference in energy of changed vs current state spins. If the change is suitable, we get to keep the changed lattice. Otherwise we need to reverse the change.
-        
-        For far-away spins we choose equation from Newman which relies only on current state spins. This way we only calculate the current state energy.
-        
-        For simplier code implementation we choose to calculate it the neighbouring way.
+        Exchanging up spin u with down spin d gives dE = 2*(n_u - n_d), where n are sums of neighbouring spins. If u and d are neighbours, each bond they share does not change but it is included in both sums, which is corrected by +4 per bond.
         
         '''
-            
-        dEu = state[up[p1, 0], up[p1, 1]] * get_neighborhood(state, up[p1,:]) + state[down[p2, 0], down[p2, 1]] * get_neighborhood(state, down[p2,:])
+        ui, uj = up_i[p1], up_j[p1]
+        di, dj = down_i[p2], down_j[p2]
         
-        state[up[p1, 0], up[p1, 1]] = -state[up[p1, 0], up[p1, 1]]
-        state[down[p2, 0], down[p2, 1]] = -state[down[p2, 0], down[p2, 1]]
-
-        dEv = state[up[p1, 0], up[p1, 1]] * get_neighborhood(state, up[p1,:]) + state[down[p2, 0], down[p2, 1]] * get_neighborhood(state, down[p2,:])
+        dE = 2 * (get_neighborhood(state, (ui, uj)) - get_neighborhood(state, (di, dj)))
+        
+        # +4 for every shared bond, directly and across the border (both at grid_size == 2)
+        dist_i = abs(ui - di)
+        dist_j = abs(uj - dj)
+        if dist_i == 0:
+            dE += 4 * ((dist_j == 1) + (dist_j == grid_size - 1))
+        elif dist_j == 0:
+            dE += 4 * ((dist_i == 1) + (dist_i == grid_size - 1))
 
-        if ((dEu - dEv) <= 0 ) or (rng.random() < exponent[int(dEu - dEv - 1)]):
-            #spins are kept, cause we made the change earlier. we do update the lists though
-            up, down = coord_swap(up, down, p1, p2)
-        else:
-            state[up[p1, 0], up[p1, 1]] = -state[up[p1, 0], up[p1, 1]]
-            state[down[p2, 0], down[p2, 1]] = -state[down[p2, 0], down[p2, 1]]
+        if rand[k] < exp_table[int(dE) + 16]:
+            state[ui, uj] = -1
+            state[di, dj] = 1
+            up_i[p1], down_i[p2] = di, ui
+            up_j[p1], down_j[p2] = dj, uj
             
-    return state                                               
\ No newline at end of file
+    return state
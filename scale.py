@@ -1,6 +1,8 @@
+import functools
+
 import numpy as np
 from scipy.integrate import trapezoid
-from scipy.signal import convolve2d
+from scipy.ndimage import uniform_filter
 
 
 def scale_data(data, scale):
@@ -33,11 +35,25 @@ def scale_data(data, scale):
     """
     out_x = np.ceil(data.shape[0] / scale).astype(int)
     out_y = np.ceil(data.shape[1] / scale).astype(int)
-    out = np.zeros((out_x, out_y))
-    for ix, x in enumerate(np.arange(0, data.shape[0], scale)):
-        for iy, y in enumerate(np.arange(0, data.shape[1], scale)):
-            out[ix, iy] = np.mean(data[x : x + scale, y : y + scale])
-    return out
+    if data.shape[0] % scale == 0 and data.shape[1] % scale == 0:
+        return data.reshape(out_x, scale, out_y, scale).mean(axis=(1, 3))
+    # Incomplete border units are padded with zeros and their sums
+    # are divided by the number of real cells they contain (NaN in
+    # data still propagates, as in the divisible case).
+    padded = np.zeros((out_x * scale, out_y * scale))
+    padded[: data.shape[0], : data.shape[1]] = data
+    counts = np.zeros((out_x * scale, out_y * scale))
+    counts[: data.shape[0], : data.shape[1]] = 1
+    sums = padded.reshape(out_x, scale, out_y, scale).sum(axis=(1, 3))
+    return sums / counts.reshape(out_x, scale, out_y, scale).sum(axis=(1, 3))
+
+
+@functools.lru_cache
+def _auto_scales(shape):
+    """Scales (powers of 2) used by auto_scale for data of given shape."""
+    scales = (2 ** np.arange(0, np.floor(np.log2(np.min(shape))))).astype(int)
+    scales.flags.writeable = False
+    return scales
 
 
 def auto_scale(data, analysis_fn=np.std):
@@ -59,7 +75,7 @@ def auto_scale(data, analysis_fn=np.std):
             Values obtained by analysis_fn when analyzing
             scaled data. Normalized by the first value.
     """
-    scales = (2 ** np.arange(0, np.floor(np.log2(np.min(data.shape))))).astype(int)
+    scales = _auto_scales(data.shape)
     vals = np.array([analysis_fn(scale_data(data, scale)) for scale in scales])
     if vals[0] != 0:
         rel_vals = vals / vals[0]
@@ -131,6 +147,7 @@ def scale_data_convolve(data, scale):
         Note that the newly made geographical units are
         allowed to overlap.
     """
-    averaging_kernel = np.ones((scale, scale)) / (scale**2)
-    scaled_data = convolve2d(data, averaging_kernel, mode="same", boundary="wrap")
+    # Averaging kernel is separable, so the filter is applied as two
+    # one-dimensional running means (cost does not grow with scale).
+    scaled_data = uniform_filter(np.asarray(data, dtype=float), size=scale, mode="wrap")
     return scaled_data
@@ -0,0 +1,68 @@
+import numpy as np
+from numba import njit, prange
+
+from ising import _make_exp_table, _sweep_ising
+from wolff import calcE
+
+
+def drive_pt(states, betas, n_sweeps, swap_every, rng):
+    """Run parallel tempering of independent Ising model replicas.
+
+    Every replica is swept with Metropolis dynamics at its own inverse
+    temperature, all replicas in parallel. Every swap_every sweeps a
+    random pair of neighboring temperatures tries to exchange their
+    configurations.
+
+    Input:
+        states:
+            Array of [K x N x N] size with K replicas of the Ising model,
+            replica k is kept at inverse temperature betas[k]. Updated in
+            place.
+        betas:
+            K inverse temperatures (1/kT), neighboring values are
+            candidates for swaps.
+        n_sweeps:
+            Number of sweeps (N**2 MC steps each) for every replica.
+        swap_every:
+            Number of sweeps between swap attempts.
+        rng:
+            numpy Random Generator (or compatible) object.
+
+    Output:
+        Updated states ([K x N x N] array), replica k still at betas[k].
+    """
+    betas = np.asarray(betas, dtype=float)
+    n_replicas, grid_size = states.shape[0], states.shape[1]
+    # compiled sweep does not check bounds, so shapes are checked here
+    if betas.shape != (n_replicas,):
+        raise ValueError(
+            f"need one beta per replica, got betas of shape {betas.shape} for {n_replicas} replicas"
+        )
+    if swap_every < 1:
+        raise ValueError(f"swap_every must be at least 1, got {swap_every}")
+    n_steps = grid_size**2
+
+    exp_tables = np.array([_make_exp_table(beta) for beta in betas])
+
+    for sweep in range(1, n_sweeps + 1):
+        pos_i = rng.integers(0, grid_size, size=(n_replicas, n_steps))
+        pos_j = rng.integers(0, grid_size, size=(n_replicas, n_steps))
+        u = rng.random((n_replicas, n_steps))
+
+        _sweep_replicas(states, exp_tables, pos_i, pos_j, u)
+
+        if sweep % swap_every == 0 and n_replicas > 1:
+            k = rng.integers(0, n_replicas - 1)
+            # calcE sums s_i*s_j over bonds, so physical energy is -calcE
+            dE = calcE(states[k + 1]) - calcE(states[k])
+            if rng.random() < np.exp(min(0, (betas[k] - betas[k + 1]) * dE)):
+                states[[k, k + 1]] = states[[k + 1, k]]
+
+    return states
+
+
+@njit(cache=True, parallel=True)
+def _sweep_replicas(states, exp_tables, pos_i, pos_j, u):
+    """Sweep every replica once, replicas run in parallel (compiled)."""
+    for k in prange(states.shape[0]):
+        _sweep_ising(states[k], exp_tables[k], pos_i[k], pos_j[k], u[k])
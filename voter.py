@@ -1,4 +1,5 @@
 import numpy as np
+from numba import njit
 
 
 def initialize_state(grid_size, rng):
@@ -15,22 +16,8 @@ def initialize_state(grid_size, rng):
         all values either 1 or -1.
     """
     if rng.random() < 0.5:
-        return -np.ones((grid_size, grid_size))
-    return np.ones((grid_size, grid_size))
-
-
-def _get_neighbor(state, pos, rng):
-    """Get a state of random neighbor from four cardinal neighbors."""
-    grid_size = state.shape[0]
-
-    neigh = pos.copy()
-    # random cardinal direction
-    axis = [0, 1][rng.random() < 0.5]
-    dir = [-1, 1][rng.random() < 0.5]
-    # pick wraping around the border
-    neigh[axis] = (neigh[axis] + dir) % grid_size
-
-    return state[neigh[0], neigh[1]]
+        return -np.ones((grid_size, grid_size), dtype=np.int8)
+    return np.ones((grid_size, grid_size), dtype=np.int8)
 
 
 def update_state_voter(state, prob, rng):
@@ -52,12 +39,30 @@ def update_state_voter(state, prob, rng):
     grid_size = state.shape[0]
     n_steps = grid_size**2
 
-    for _ in range(n_steps):
-        pos = rng.integers(0, grid_size, size=2)
+    # random numbers for the whole sweep are drawn in one go
+    pos_i = rng.integers(0, grid_size, size=n_steps)
+    pos_j = rng.integers(0, grid_size, size=n_steps)
+    u = rng.random(n_steps)
+    rand_spin = 2 * rng.integers(0, 2, size=n_steps) - 1
+    axes = rng.integers(0, 2, size=n_steps)
+    dirs = 2 * rng.integers(0, 2, size=n_steps) - 1
+
+    # random cardinal neighbor of every selected agent, wrapping around
+    # the border; its state is only read when the step is taken
+    neigh_i = (pos_i + (1 - axes) * dirs) % grid_size
+    neigh_j = (pos_j + axes * dirs) % grid_size
+
+    return _sweep_voter(state, prob, pos_i, pos_j, u, rand_spin, neigh_i, neigh_j)
+
 
-        if rng.random() < prob:
-            state[pos[0], pos[1]] = [-1, 1][rng.random() < 0.5]
+@njit(cache=True, fastmath=True)
+def _sweep_voter(state, prob, pos_i, pos_j, u, rand_spin, neigh_i, neigh_j):
+    """Perform noisy voter steps on state in place (compiled), one for
+    each set of pre-drawn random numbers."""
+    for k in range(pos_i.shape[0]):
+        if u[k] < prob:
+            state[pos_i[k], pos_j[k]] = rand_spin[k]
         else:
-            state[pos[0], pos[1]] = _get_neighbor(state, pos, rng)
+            state[pos_i[k], pos_j[k]] = state[neigh_i[k], neigh_j[k]]
 
     return state
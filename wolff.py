@@ -1,9 +1,10 @@
 import numpy as np
+from numba import njit
 
 def initialize_state(N, rng=np.random.default_rng()):
-    return 2*np.around(rng.random((N,N)))-1
+    return (2*rng.integers(0, 2, (N,N))-1).astype(np.int8)
 
-def stepMC(lattice, kT, rng=np.random.default_rng()):
+def stepMC(lattice, kT, rng=np.random.default_rng(), P=None):
     '''
     Performs action of applying cluster area to lattice. Applied area is flipped.
     Input:
@@ -13,65 +14,74 @@ def stepMC(lattice, kT, rng=np.random.default_rng()):
             beta parameter, temperature at which simulations take place. Can also be changed with J.
         rng:
             random generator object
+        P:
+            probability to include spin to the cluster, 1 - exp(-2*kT). Calculated from kT if not given, pass it to avoid recalculating it every step.
     Output:
-        Lattice with flipped cluster.
+        Lattice with flipped cluster. Lattice is updated in place.
     '''
     grid_size = lattice.shape[0]
-    state = np.ones((grid_size, grid_size))
     
-    state = update(lattice,
-                   state, 
-                   np.array((np.around((grid_size-1)*rng.random()), np.around((grid_size-1)*rng.random()))).astype(int),
-                   (1 - np.exp(-2*kT)),
-                   rng)
+    if P is None:
+        P = 1 - np.exp(-2*kT)
+    
+    cluster = _grow_cluster(lattice,
+                            np.array((np.around((grid_size-1)*rng.random()), np.around((grid_size-1)*rng.random()))).astype(int),
+                            P,
+                            rng.integers(0, 2**32))
     
-    return lattice*state
+    lattice[cluster] = -lattice[cluster]
     
-def update(lattice, state, pos, P, rng = np.random.default_rng()):
+    return lattice
+
+@njit(cache=True)
+def _grow_cluster(lattice, pos0, P, seed):
     '''
-    Recursive function which selects cluster with certain probability P and returns same dim as lattice variable "state". This variable marks the area of cluster.
+    Iterative (stack based) flood fill which selects cluster with certain probability P. Spins are marked as part of the cluster when pushed to the stack, so every spin is visited once.
     Input:
-        lattice, kT, rng:
+        lattice:
             same as in stepMC
-        state:
-            position of cluster on lattice.
+        pos0:
+            seed spin
         P:
             probability to include spin to the cluster
-        pos:
-            seed spin
+        seed:
+            seed for the random number generator of the compiled function
     Output:
-        mapped area of cluster.
+        cluster:
+            boolean array of lattice dim, True marks the area of cluster.
     '''
-    state[pos[0],pos[1]] *= -1
+    np.random.seed(seed)
+    
+    grid_size = lattice.shape[0]
+    cluster = np.zeros((grid_size, grid_size), dtype=np.bool_)
+    # flattened indices i*grid_size + j, each spin is pushed at most once
+    stack = np.empty(grid_size*grid_size, dtype=np.int32)
+    
+    cluster[pos0[0], pos0[1]] = True
+    stack[0] = pos0[0]*grid_size + pos0[1]
+    top = 1
     
-    for i in pos_neighbourhood(state, pos):
+    while top > 0:
+        top -= 1
+        i = stack[top] // grid_size
+        j = stack[top] % grid_size
+        s = lattice[i, j]
         
-        if((lattice[pos[0], pos[1]] == lattice[i[0], i[1]])
-           and (rng.random() < P) 
-           and (state[i[0], i[1]] == 1)):
+        for n in range(4):
+            # boundaries continue on opposite side
+            ni = (i + (1, -1, 0, 0)[n]) % grid_size
+            nj = (j + (0, 0, 1, -1)[n]) % grid_size
             
-            state = update(lattice, state, np.array((i[0], i[1])), P, rng)
-            
-    return state
+            if((s == lattice[ni, nj])
+               and not cluster[ni, nj]
+               and (np.random.random() < P)):
+                
+                cluster[ni, nj] = True
+                stack[top] = ni*grid_size + nj
+                top += 1
     
-def pos_neighbourhood(__state, pos):
-    '''
-    Gets coords of closest neighbours. Closest meaning bordering on the side lattices.
-    Input:
-        state:
-            Matrix of grid_size**2 cell count.
-        pos:
-            Coordinates of position for the selected cell.
-    Output:
-            array of 4 rows with x and y coordinates for neighbour
-    '''
-    grid_size = __state.shape[0]
+    return cluster
     
-    return np.array((((pos[0] + 1) % grid_size, pos[1]),
-                     ((pos[0] - 1) % grid_size, pos[1]),
-                     (pos[0], (pos[1] + 1) % grid_size),
-                     (pos[0], (pos[1] - 1) % grid_size)))
-
 def calcE(state, H = 0, mu = 1):
     '''
     Function for calculating overall energy of spin matrix.
@@ -85,17 +95,9 @@ def calcE(state, H = 0, mu = 1):
             total energy
     '''
     
-    E = 0
+    # boundaries continue on opposite side
+    n = np.roll(state, 1, 0) + np.roll(state, -1, 0) + np.roll(state, 1, 1) + np.roll(state, -1, 1)
     
-    for a, k in enumerate(state):
-        for b, l in enumerate(k):
-            
-            N1 = len(state[:, 0])
-            N2 = len(state[0, :])
-            
-            s = state[a, b]
-            n = state[(a+1)%N1, b] + state[(a-1)%N1, b] + state[a, (b+1)%N2] + state[a, (b-1)%N2]
-            
-            E += (n*s)/2 + mu*H*s
+    E = np.sum(n*state)/2 + mu*H*np.sum(state)
     
-    return E     
\ No newline at end of file
+    return E